@@ -1,14 +1,15 @@
-import json
+import asyncio
 import logging
 import os
+import time
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import agent_framework
 from agent_framework import RawAgent
 from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
 # Compatibility shim: agent-framework 1.0.0rc6 renamed ChatAgent → RawAgent,
@@ -18,16 +19,28 @@ if not hasattr(agent_framework, "ChatAgent"):
 
 from microsoft_agents.hosting.core import Authorization, TurnContext
 from microsoft_agents_a365.notifications.agent_notification import NotificationTypes
-from microsoft_agents_a365.tooling.extensions.agentframework.services.mcp_tool_registration_service import McpToolRegistrationService
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .auth import LocalAuthenticationOptions
 from .token_cache import get_cached_agentic_token
 
+if TYPE_CHECKING:
+    from microsoft_agents_a365.tooling.extensions.agentframework.services.mcp_tool_registration_service import McpToolRegistrationService
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Environment flags are fixed for the life of the process; parse them once.
+_ENABLE_MCP = os.getenv("ENABLE_MCP", "false").lower() == "true"
+_USE_AGENTIC_AUTH = os.getenv("USE_AGENTIC_AUTH", "false").lower() == "true"
+
+# Upper bound on MCP server registration so an unreachable server can't stall a turn
+MCP_SETUP_TIMEOUT_SECONDS = float(os.getenv("MCP_SETUP_TIMEOUT_SECONDS", "60"))
+# After a failed attempt, wait before retrying (doubling each time, up to the cap)
+MCP_SETUP_RETRY_BACKOFF_SECONDS = 30
+MCP_SETUP_RETRY_BACKOFF_MAX_SECONDS = 300
+
 
 # =============================================================================
 # CONFIGURATION MODELS
@@ -48,15 +61,17 @@ class ToolingManifest(BaseModel):
     def load(cls, path: Path = None) -> "ToolingManifest":
         if path is None:
             path = Path("ToolingManifest.json")
-        if not path.exists():
-            logger.warning(f"ToolingManifest.json not found at {path}")
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            logger.warning("ToolingManifest.json not found at %s", path)
             return cls(mcpServers=[])
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return cls(**data)
+        return cls.model_validate_json(raw)
 
 
 class AgentConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     endpoint: str = Field(...)
     deployment: str = Field(...)
     api_version: str = Field(default="")
@@ -69,24 +84,35 @@ class AgentConfig(BaseModel):
 
     @classmethod
     def from_env(cls) -> "AgentConfig":
-        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "")
-        deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "")
-        if not endpoint or not deployment:
-            raise ValueError("AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT required")
-        enable_mcp = os.getenv("ENABLE_MCP", "false").lower() == "true"
-        tooling_manifest = ToolingManifest.load() if enable_mcp else None
-        if enable_mcp and (not tooling_manifest or not tooling_manifest.mcpServers):
-            raise ValueError("ENABLE_MCP=true requires ToolingManifest.json with at least one MCP server")
-        return cls(
-            endpoint=endpoint,
-            deployment=deployment,
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", ""),
-            enable_mcp=enable_mcp,
-            mcp_server_host=os.getenv("MCP_SERVER_HOST", ""),
-            mcp_platform_endpoint=os.getenv("MCP_PLATFORM_ENDPOINT", ""),
-            python_environment=os.getenv("PYTHON_ENVIRONMENT", "development"),
-            tooling_manifest=tooling_manifest,
-        )
+        return _agent_config_from_env(cls)
+
+
+# Environment is fixed after startup, so from_env configs are parsed once per class
+# and shared by every caller (hence frozen models). HostConfig and
+# LocalAuthenticationOptions follow the same pattern.
+@lru_cache(maxsize=None)
+def _agent_config_from_env(cls: type[AgentConfig]) -> AgentConfig:
+    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "")
+    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "")
+    if not endpoint or not deployment:
+        raise ValueError("AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT required")
+    tooling_manifest = ToolingManifest.load() if _ENABLE_MCP else None
+    if _ENABLE_MCP and (not tooling_manifest or not tooling_manifest.mcpServers):
+        raise ValueError("ENABLE_MCP=true requires ToolingManifest.json with at least one MCP server")
+    return cls(
+        endpoint=endpoint,
+        deployment=deployment,
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION", ""),
+        enable_mcp=_ENABLE_MCP,
+        mcp_server_host=os.getenv("MCP_SERVER_HOST", ""),
+        mcp_platform_endpoint=os.getenv("MCP_PLATFORM_ENDPOINT", ""),
+        python_environment=os.getenv("PYTHON_ENVIRONMENT", "development"),
+        tooling_manifest=tooling_manifest,
+    )
+
+
+async def _mcp_setup_done(*_args, **_kwargs) -> None:
+    """Stand-in for setup_mcp_servers once MCP servers are configured."""
 
 
 # =============================================================================
@@ -130,14 +156,20 @@ CRITICAL SECURITY RULES — NEVER VIOLATE THESE:
         self.auth_options = LocalAuthenticationOptions.from_environment()
         self.agent: Optional[RawAgent] = None
         self.chat_client: Optional[AzureOpenAIChatClient] = None
-        self.tool_service: Optional[McpToolRegistrationService] = None
+        self.tool_service: Optional["McpToolRegistrationService"] = None
         self.mcp_initialized = False
+        self._mcp_failures = 0
+        self._mcp_retry_at = 0.0
 
     # -------------------------------------------------------------------------
     # Initialization
     # -------------------------------------------------------------------------
 
     async def initialize(self) -> None:
+        # Deferred: azure.identity and the MCP tooling stack are only needed once
+        # the agent is actually brought up, not at import time.
+        from azure.identity import DefaultAzureCredential
+
         self.chat_client = AzureOpenAIChatClient(
             endpoint=self.config.endpoint,
             credential=DefaultAzureCredential(),
@@ -150,6 +182,9 @@ CRITICAL SECURITY RULES — NEVER VIOLATE THESE:
             tools=[],
         )
         if self.config.enable_mcp:
+            # Imported outside the try: a missing tooling install with ENABLE_MCP=true must fail loudly
+            from microsoft_agents_a365.tooling.extensions.agentframework.services.mcp_tool_registration_service import McpToolRegistrationService
+
             try:
                 self.tool_service = McpToolRegistrationService()
                 server_names = (
@@ -163,9 +198,9 @@ CRITICAL SECURITY RULES — NEVER VIOLATE THESE:
                     ", ".join(server_names),
                 )
             except Exception as e:
-                self.logger.warning(f"⚠️ MCP tool service failed: {e}")
+                self.logger.warning("⚠️ MCP tool service failed: %s", e)
                 self.tool_service = None
-        self.logger.info(f"✅ {self.__class__.__name__} initialized")
+        self.logger.info("✅ %s initialized", self.__class__.__name__)
 
     # -------------------------------------------------------------------------
     # MCP setup (per-turn, keyed to the first turn)
@@ -180,39 +215,57 @@ CRITICAL SECURITY RULES — NEVER VIOLATE THESE:
     ):
         if not self.config.enable_mcp or self.mcp_initialized or not self.tool_service:
             return
+        if time.monotonic() < self._mcp_retry_at:
+            return
 
         agent_instructions = instructions or self.AGENT_PROMPT
-        use_agentic_auth = os.getenv("USE_AGENTIC_AUTH", "false").lower() == "true"
+        kwargs = {}
+        if _USE_AGENTIC_AUTH:
+            self.logger.info("Using agentic authentication for MCP")
+        else:
+            self.logger.info("Using bearer token authentication for MCP")
+            kwargs["auth_token"] = self.auth_options.bearer_token
 
         try:
-            if use_agentic_auth:
-                self.logger.info("Using agentic authentication for MCP")
-                self.agent = await self.tool_service.add_tool_servers_to_agent(
-                    chat_client=self.chat_client,
-                    agent_instructions=agent_instructions,
-                    initial_tools=[],
-                    auth=auth,
-                    auth_handler_name=auth_handler_name,
-                    turn_context=context,
-                )
-            else:
-                self.logger.info("Using bearer token authentication for MCP")
-                self.agent = await self.tool_service.add_tool_servers_to_agent(
+            self.agent = await asyncio.wait_for(
+                self.tool_service.add_tool_servers_to_agent(
                     chat_client=self.chat_client,
                     agent_instructions=agent_instructions,
                     initial_tools=[],
                     auth=auth,
                     auth_handler_name=auth_handler_name,
-                    auth_token=self.auth_options.bearer_token,
                     turn_context=context,
-                )
+                    **kwargs,
+                ),
+                timeout=MCP_SETUP_TIMEOUT_SECONDS,
+            )
             if self.agent:
                 self.mcp_initialized = True
+                # Later turns go straight to the no-op instead of re-checking flags
+                self.setup_mcp_servers = _mcp_setup_done
                 self.logger.info("✅ MCP servers configured")
             else:
                 self.logger.warning("⚠️ MCP setup returned no agent")
+        except TimeoutError:
+            await self._schedule_mcp_retry(f"timed out after {MCP_SETUP_TIMEOUT_SECONDS}s")
         except Exception as e:
-            self.logger.error(f"MCP setup error: {e}")
+            await self._schedule_mcp_retry(f"error: {e}")
+
+    async def _schedule_mcp_retry(self, reason: str):
+        # A failed or cancelled registration may have opened clients/servers; release
+        # them before retrying so a dead server doesn't accumulate connections.
+        try:
+            await self.tool_service.cleanup()
+        except Exception as e:
+            self.logger.warning("⚠️ MCP cleanup after failed setup failed: %s", e)
+
+        self._mcp_failures += 1
+        delay = min(
+            MCP_SETUP_RETRY_BACKOFF_SECONDS * 2 ** (self._mcp_failures - 1),
+            MCP_SETUP_RETRY_BACKOFF_MAX_SECONDS,
+        )
+        self._mcp_retry_at = time.monotonic() + delay
+        self.logger.error("MCP setup %s; retrying in %ss", reason, delay)
 
     # -------------------------------------------------------------------------
     # Message processing
@@ -229,14 +282,15 @@ CRITICAL SECURITY RULES — NEVER VIOLATE THESE:
             getattr(from_prop, "id", None) or "(unknown)",
         )
 
-        personalized_prompt = self.AGENT_PROMPT.replace("{user_name}", display_name)
-
         try:
-            await self.setup_mcp_servers(auth, auth_handler_name, context, instructions=personalized_prompt)
+            # The personalized prompt only feeds MCP setup; skip building it once that's settled
+            if not self.mcp_initialized and self.tool_service:
+                personalized_prompt = self.AGENT_PROMPT.replace("{user_name}", display_name)
+                await self.setup_mcp_servers(auth, auth_handler_name, context, instructions=personalized_prompt)
             result = await self.agent.run(message)
             return self._extract_result(result) or "I couldn't process your request at this time."
         except Exception as e:
-            self.logger.error(f"Error processing message: {e}")
+            self.logger.error("Error processing message: %s", e)
             return f"Sorry, I encountered an error: {str(e)}"
 
     # -------------------------------------------------------------------------
@@ -248,7 +302,7 @@ CRITICAL SECURITY RULES — NEVER VIOLATE THESE:
     ) -> str:
         try:
             notification_type = notification_activity.notification_type
-            self.logger.info(f"📬 Processing notification: {notification_type}")
+            self.logger.info("📬 Processing notification: %s", notification_type)
 
             await self.setup_mcp_servers(auth, auth_handler_name, context)
 
@@ -285,7 +339,7 @@ CRITICAL SECURITY RULES — NEVER VIOLATE THESE:
                 return self._extract_result(result) or "Notification processed."
 
         except Exception as e:
-            self.logger.error(f"Error processing notification: {e}")
+            self.logger.error("Error processing notification: %s", e)
             return f"Sorry, I encountered an error processing the notification: {str(e)}"
 
     # -------------------------------------------------------------------------
@@ -312,4 +366,4 @@ CRITICAL SECURITY RULES — NEVER VIOLATE THESE:
                 await self.tool_service.cleanup()
             self.logger.info("Agent cleanup completed")
         except Exception as e:
-            self.logger.error(f"Cleanup error: {e}")
+            self.logger.error("Cleanup error: %s", e)
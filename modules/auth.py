@@ -1,12 +1,13 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-@dataclass
+@dataclass(frozen=True)
 class LocalAuthenticationOptions:
     """
     Authentication options for local/dev scenarios (bearer token MCP access).
@@ -21,7 +22,12 @@ class LocalAuthenticationOptions:
 
     @classmethod
     def from_environment(cls) -> "LocalAuthenticationOptions":
-        return cls(
-            env_id=os.getenv("ENV_ID", ""),
-            bearer_token=os.getenv("BEARER_TOKEN", ""),
-        )
+        return _auth_options_from_env()
+
+
+@lru_cache(maxsize=1)
+def _auth_options_from_env() -> LocalAuthenticationOptions:
+    return LocalAuthenticationOptions(
+        env_id=os.getenv("ENV_ID", ""),
+        bearer_token=os.getenv("BEARER_TOKEN", ""),
+    )
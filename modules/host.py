@@ -1,14 +1,15 @@
 import asyncio
+import errno
 import logging
 import os
 import socket
+from functools import lru_cache
 from os import environ
 from typing import Type
 
 from aiohttp.web import Application, Request, Response, json_response, run_app
 from aiohttp.web_middlewares import middleware as web_middleware
 from dotenv import load_dotenv
-from microsoft_agents_a365.observability.core.config import configure
 from microsoft_agents.activity import load_configuration_from_env, Activity
 from microsoft_agents.authentication.msal import MsalConnectionManager
 from microsoft_agents.hosting.aiohttp import CloudAdapter, start_agent_process, jwt_authorization_middleware
@@ -31,7 +32,7 @@ from microsoft_agents_a365.notifications.agent_notification import (
 from microsoft_agents_a365.notifications import EmailResponse
 from microsoft_agents_a365.observability.core.middleware.baggage_builder import BaggageBuilder
 from microsoft_agents_a365.runtime.environment_utils import get_observability_authentication_scope
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .agent import AgentInterface
 from .token_cache import cache_agentic_token
@@ -46,8 +47,22 @@ logger = logging.getLogger(__name__)
 
 agents_sdk_config = load_configuration_from_env(environ)
 
+_ENABLE_OBSERVABILITY = os.getenv("ENABLE_OBSERVABILITY", "true").lower() == "true"
+
+# Shared by every request in anonymous mode; built once instead of per request.
+ANONYMOUS_IDENTITY = ClaimsIdentity(
+    {
+        AuthenticationConstants.AUDIENCE_CLAIM: "anonymous",
+        AuthenticationConstants.APP_ID_CLAIM: "anonymous-app",
+    },
+    False,
+    "Anonymous",
+)
+
 
 class HostConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     port: int = Field(default=3978)
     host: str = Field(default="localhost")
     service_name: str = Field(default="agent365-service")
@@ -56,31 +71,60 @@ class HostConfig(BaseModel):
 
     @classmethod
     def from_env(cls) -> "HostConfig":
-        # Bind to 0.0.0.0 when running on App Service so health probes can reach the container
-        is_app_service = bool(os.getenv("WEBSITE_SITE_NAME"))
-        return cls(
-            port=int(os.getenv("PORT", "3978")),
-            host="0.0.0.0" if is_app_service else "localhost",
-            service_name=os.getenv("OBSERVABILITY_SERVICE_NAME", "agent365-service"),
-            service_namespace=os.getenv("OBSERVABILITY_SERVICE_NAMESPACE", "agent-monitoring"),
-            enable_observability=os.getenv("ENABLE_OBSERVABILITY", "true").lower() == "true",
-        )
+        return _host_config_from_env(cls)
+
+
+@lru_cache(maxsize=None)
+def _host_config_from_env(cls: type[HostConfig]) -> HostConfig:
+    # Bind to 0.0.0.0 when running on App Service so health probes can reach the container
+    is_app_service = bool(os.getenv("WEBSITE_SITE_NAME"))
+    return cls(
+        port=int(os.getenv("PORT", "3978")),
+        host="0.0.0.0" if is_app_service else "localhost",
+        service_name=os.getenv("OBSERVABILITY_SERVICE_NAME", "agent365-service"),
+        service_namespace=os.getenv("OBSERVABILITY_SERVICE_NAMESPACE", "agent-monitoring"),
+        enable_observability=_ENABLE_OBSERVABILITY,
+    )
+
+
+# WSAEADDRINUSE is 10048 on Windows; errno exposes it only there.
+_ADDR_IN_USE_ERRNOS = {errno.EADDRINUSE, getattr(errno, "WSAEADDRINUSE", 10048)}
+
+
+def _port_is_free(host: str, port: int) -> bool:
+    # A bind attempt fails immediately with EADDRINUSE, unlike a connect probe
+    # which can wait on a timeout. Mirror aiohttp's SO_REUSEADDR on POSIX so
+    # TIME_WAIT leftovers aren't mistaken for a live listener; on Windows the
+    # option would let the bind succeed over one, so it is left off there.
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        if os.name != "nt":
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((host, port))
+        except OSError as e:
+            if e.errno in _ADDR_IN_USE_ERRNOS:
+                return False
+            # Anything else (EACCES, EADDRNOTAVAIL, ...) isn't "busy"; let run_app report it
+    return True
 
 
 class AgentHost:
     def __init__(self, agent_class: Type[AgentInterface], config: HostConfig = None):
         self.agent_class = agent_class
         self.agent_instance = None
+        self._init_task: asyncio.Task | None = None
         self.config = config or HostConfig.from_env()
 
         # AUTH_HANDLER_NAME=AGENTIC for production; empty/unset = anonymous mode
         self.auth_handler_name = os.getenv("AUTH_HANDLER_NAME", "") or None
         if self.auth_handler_name:
-            logger.info(f"🔐 Using auth handler: {self.auth_handler_name}")
+            logger.info("🔐 Using auth handler: %s", self.auth_handler_name)
         else:
             logger.info("🔓 No auth handler configured — running in anonymous mode")
 
         if self.config.enable_observability:
+            from microsoft_agents_a365.observability.core.config import configure
+
             configure(
                 service_name=self.config.service_name,
                 service_namespace=self.config.service_namespace,
@@ -110,11 +154,18 @@ class AgentHost:
     def _setup_handlers(self):
         handler_config = {"auth_handlers": [self.auth_handler_name]} if self.auth_handler_name else {}
 
+        # Bound once here so per-turn dispatch doesn't re-walk self.* attribute chains.
+        # agent_instance is left on self because it is populated after startup.
+        auth = self.agent_app.auth
+        auth_handler_name = self.auth_handler_name
+        validate = self._validate_agent_and_setup_context
+        help_text = (
+            f"👋 **Hi there!** I'm **{self.agent_class.__name__}**, your AI assistant.\n\n"
+            "How can I help you today?"
+        )
+
         async def help_handler(context: TurnContext, _: TurnState):
-            await context.send_activity(
-                f"👋 **Hi there!** I'm **{self.agent_class.__name__}**, your AI assistant.\n\n"
-                "How can I help you today?"
-            )
+            await context.send_activity(help_text)
 
         self.agent_app.conversation_update("membersAdded", **handler_config)(help_handler)
         self.agent_app.message("/help", **handler_config)(help_handler)
@@ -136,17 +187,19 @@ class AgentHost:
         @self.agent_app.activity("message", **handler_config)
         async def on_message(context: TurnContext, _: TurnState):
             try:
-                result = await self._validate_agent_and_setup_context(context)
+                # Skip trivial turns before validation so they don't pay for a token exchange
+                user_message = context.activity.text or ""
+                stripped = user_message.strip()
+                if not stripped or stripped == "/help":
+                    return
+
+                result = await validate(context)
                 if result is None:
                     return
                 tenant_id, agent_id = result
 
                 with BaggageBuilder().tenant_id(tenant_id).agent_id(agent_id).build():
-                    user_message = context.activity.text or ""
-                    if not user_message.strip() or user_message.strip() == "/help":
-                        return
-
-                    logger.info(f"📨 {user_message}")
+                    logger.info("📨 %s", user_message)
                     await context.send_activity("Got it — working on it…")
                     await context.send_activity(Activity(type="typing"))
 
@@ -161,7 +214,7 @@ class AgentHost:
                     typing_task = asyncio.create_task(_typing_loop())
                     try:
                         response = await self.agent_instance.process_user_message(
-                            user_message, self.agent_app.auth, self.auth_handler_name, context
+                            user_message, auth, auth_handler_name, context
                         )
                         await context.send_activity(response)
                     finally:
@@ -172,7 +225,7 @@ class AgentHost:
                             pass
 
             except Exception as e:
-                logger.error(f"❌ Error: {e}", exc_info=True)
+                logger.error("❌ Error: %s", e, exc_info=True)
                 await context.send_activity(f"Sorry, I encountered an error: {str(e)}")
 
         @self.agent_notification.on_agent_notification(
@@ -185,13 +238,13 @@ class AgentHost:
             notification_activity: AgentNotificationActivity,
         ):
             try:
-                result = await self._validate_agent_and_setup_context(context)
+                result = await validate(context)
                 if result is None:
                     return
                 tenant_id, agent_id = result
 
                 with BaggageBuilder().tenant_id(tenant_id).agent_id(agent_id).build():
-                    logger.info(f"📬 {notification_activity.notification_type}")
+                    logger.info("📬 %s", notification_activity.notification_type)
 
                     if not hasattr(self.agent_instance, "handle_agent_notification_activity"):
                         logger.warning("⚠️ Agent doesn't support notifications")
@@ -199,7 +252,7 @@ class AgentHost:
                         return
 
                     response = await self.agent_instance.handle_agent_notification_activity(
-                        notification_activity, self.agent_app.auth, self.auth_handler_name, context
+                        notification_activity, auth, auth_handler_name, context
                     )
 
                     if notification_activity.notification_type == NotificationTypes.EMAIL_NOTIFICATION:
@@ -209,7 +262,7 @@ class AgentHost:
                     await context.send_activity(response)
 
             except Exception as e:
-                logger.error(f"❌ Notification error: {e}")
+                logger.error("❌ Notification error: %s", e)
                 await context.send_activity(f"Sorry, I encountered an error processing the notification: {str(e)}")
 
     # -------------------------------------------------------------------------
@@ -218,11 +271,54 @@ class AgentHost:
 
     async def initialize_agent(self):
         if self.agent_instance is None:
-            logger.info(f"🤖 Initializing {self.agent_class.__name__}...")
+            logger.info("🤖 Initializing %s...", self.agent_class.__name__)
             self.agent_instance = self.agent_class()
             await self.agent_instance.initialize()
 
+    async def _start_agent_initialization(self):
+        # Run in the background so the listener accepts connections (and health
+        # probes) while the chat client and MCP tooling come up.
+        self._init_task = asyncio.create_task(self.initialize_agent())
+        self._init_task.add_done_callback(self._log_init_failure)
+
+    @staticmethod
+    def _log_init_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("❌ Agent initialization failed", exc_info=task.exception())
+
+    async def _wait_for_agent(self) -> bool:
+        if self._init_task is not None:
+            try:
+                # Shielded: a cancelled handler must not cancel the shared init task
+                await asyncio.shield(self._init_task)
+            except Exception:
+                # Already reported with traceback by _log_init_failure
+                return False
+        return self.agent_instance is not None
+
+    @property
+    def is_agent_ready(self) -> bool:
+        task = self._init_task
+        return (
+            task is not None
+            and task.done()
+            and not task.cancelled()
+            and task.exception() is None
+            and self.agent_instance is not None
+        )
+
+    @property
+    def agent_init_failed(self) -> bool:
+        task = self._init_task
+        return task is not None and task.done() and (task.cancelled() or task.exception() is not None)
+
     async def cleanup(self):
+        if self._init_task and not self._init_task.done():
+            self._init_task.cancel()
+            try:
+                await self._init_task
+            except (asyncio.CancelledError, Exception):
+                pass
         if self.agent_instance:
             await self.agent_instance.cleanup()
 
@@ -235,7 +331,7 @@ class AgentHost:
             logger.debug("Skipping observability token exchange (no auth handler)")
             return
         try:
-            logger.info(f"🔐 Token exchange for observability (tenant={tenant_id}, agent={agent_id})")
+            logger.info("🔐 Token exchange for observability (tenant=%s, agent=%s)", tenant_id, agent_id)
             exaau_token = await self.agent_app.auth.exchange_token(
                 context,
                 scopes=get_observability_authentication_scope(),
@@ -244,14 +340,15 @@ class AgentHost:
             cache_agentic_token(tenant_id, agent_id, exaau_token.token)
             logger.info("✅ Observability token cached")
         except Exception as e:
-            logger.warning(f"⚠️ Failed to cache observability token: {e}")
+            logger.warning("⚠️ Failed to cache observability token: %s", e)
 
     async def _validate_agent_and_setup_context(self, context: TurnContext):
-        tenant_id = context.activity.recipient.tenant_id
-        agent_id = context.activity.recipient.agentic_app_id
-        logger.info(f"🔍 tenant_id={tenant_id}, agent_id={agent_id}")
+        recipient = context.activity.recipient
+        tenant_id = recipient.tenant_id
+        agent_id = recipient.agentic_app_id
+        logger.info("🔍 tenant_id=%s, agent_id=%s", tenant_id, agent_id)
 
-        if not self.agent_instance:
+        if not await self._wait_for_agent():
             logger.error("❌ Agent instance not available")
             await context.send_activity("❌ Sorry, the agent is not available.")
             return None
@@ -265,17 +362,12 @@ class AgentHost:
 
     def create_auth_configuration(self) -> AgentAuthConfiguration | None:
         # Primary: explicit CLIENT_ID / TENANT_ID / CLIENT_SECRET
-        client_id = environ.get("CLIENT_ID")
-        tenant_id = environ.get("TENANT_ID")
-        client_secret = environ.get("CLIENT_SECRET")
-
         # Fallback: CONNECTIONS__SERVICE_CONNECTION__SETTINGS__* (a365 tooling convention)
-        if not client_id:
-            client_id = environ.get("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTID")
-        if not tenant_id:
-            tenant_id = environ.get("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__TENANTID")
-        if not client_secret:
-            client_secret = environ.get("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTSECRET")
+        client_id = environ.get("CLIENT_ID") or environ.get("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTID")
+        tenant_id = environ.get("TENANT_ID") or environ.get("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__TENANTID")
+        client_secret = (
+            environ.get("CLIENT_SECRET") or environ.get("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTSECRET")
+        )
 
         if client_id and tenant_id and client_secret:
             logger.info("🔒 Using Client Credentials authentication (client_id=%s)", client_id)
@@ -300,11 +392,15 @@ class AgentHost:
             return await start_agent_process(req, req.app["agent_app"], req.app["adapter"])
 
         async def health(_req: Request) -> Response:
-            return json_response({
-                "status": "ok",
-                "agent": self.agent_class.__name__,
-                "initialized": self.agent_instance is not None,
-            })
+            failed = self.agent_init_failed
+            return json_response(
+                {
+                    "status": "failed" if failed else "ok",
+                    "agent": self.agent_class.__name__,
+                    "initialized": self.is_agent_ready,
+                },
+                status=503 if failed else 200,
+            )
 
         middlewares = []
 
@@ -317,21 +413,12 @@ class AgentHost:
                     return await handler(request)
                 return await jwt_authorization_middleware(request, handler)
             middlewares.append(jwt_with_health_bypass)
-
-        @web_middleware
-        async def anonymous_claims(request, handler):
-            if not (auth_config and self.auth_handler_name):
-                request["claims_identity"] = ClaimsIdentity(
-                    {
-                        AuthenticationConstants.AUDIENCE_CLAIM: "anonymous",
-                        AuthenticationConstants.APP_ID_CLAIM: "anonymous-app",
-                    },
-                    False,
-                    "Anonymous",
-                )
-            return await handler(request)
-
-        middlewares.append(anonymous_claims)
+        else:
+            @web_middleware
+            async def anonymous_claims(request, handler):
+                request["claims_identity"] = ANONYMOUS_IDENTITY
+                return await handler(request)
+            middlewares.append(anonymous_claims)
         app = Application(middlewares=middlewares)
 
         app.router.add_post("/api/messages", entry_point)
@@ -342,22 +429,23 @@ class AgentHost:
         app["agent_app"] = self.agent_app
         app["adapter"] = self.agent_app.adapter
 
-        app.on_startup.append(lambda app: self.initialize_agent())
+        app.on_startup.append(lambda app: self._start_agent_initialization())
         app.on_shutdown.append(lambda app: self.cleanup())
 
-        desired_port = port
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(0.5)
-            if s.connect_ex((self.config.host, desired_port)) == 0:
-                port = desired_port + 1
-
-        print("=" * 80)
-        print(f"🏢 {self.agent_class.__name__}")
-        print("=" * 80)
-        print(f"🔒 Auth: {'Enabled (' + self.auth_handler_name + ')' if self.auth_handler_name else 'Anonymous'}")
-        print(f"🚀 Server: {self.config.host}:{port}")
-        print(f"📚 Endpoint: http://{self.config.host}:{port}/api/messages")
-        print(f"❤️  Health:   http://{self.config.host}:{port}/api/health\n")
+        if not _port_is_free(self.config.host, port):
+            port += 1
+
+        rule = "=" * 80
+        auth_mode = f"Enabled ({self.auth_handler_name})" if self.auth_handler_name else "Anonymous"
+        print(
+            f"{rule}\n"
+            f"🏢 {self.agent_class.__name__}\n"
+            f"{rule}\n"
+            f"🔒 Auth: {auth_mode}\n"
+            f"🚀 Server: {self.config.host}:{port}\n"
+            f"📚 Endpoint: http://{self.config.host}:{port}/api/messages\n"
+            f"❤️  Health:   http://{self.config.host}:{port}/api/health\n"
+        )
 
         try:
             run_app(app, host=self.config.host, port=port, handle_signals=True)
@@ -1,24 +1,52 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
-# Global token cache for Agent 365 Observability exporter
-_agentic_token_cache = {}
+# Bounded so long-running hosts don't grow without limit; the TTL sits just
+# under the ~1h lifetime of the exchanged agentic token.
+_CACHE_MAXSIZE = 4096
+_CACHE_TTL_SECONDS = 3300
+
+# Global token cache for Agent 365 Observability exporter:
+# (tenant_id, agent_id) -> (expires_at, token)
+_agentic_token_cache: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+# Written from request handlers, read from the exporter's background thread;
+# the LRU/TTL bookkeeping is multi-step, so guard it explicitly rather than
+# relying on the GIL.
+_agentic_token_cache_lock = threading.Lock()
 
 
 def cache_agentic_token(tenant_id: str, agent_id: str, token: str) -> None:
     """Cache the agentic token for use by Agent 365 Observability exporter."""
-    key = f"{tenant_id}:{agent_id}"
-    _agentic_token_cache[key] = token
-    logger.debug(f"Cached agentic token for {key}")
+    key = (tenant_id, agent_id)
+    with _agentic_token_cache_lock:
+        _agentic_token_cache[key] = (time.monotonic() + _CACHE_TTL_SECONDS, token)
+        _agentic_token_cache.move_to_end(key)
+        while len(_agentic_token_cache) > _CACHE_MAXSIZE:
+            _agentic_token_cache.popitem(last=False)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Cached agentic token for %s:%s", tenant_id, agent_id)
 
 
 def get_cached_agentic_token(tenant_id: str, agent_id: str) -> str | None:
     """Retrieve cached agentic token for Agent 365 Observability exporter."""
-    key = f"{tenant_id}:{agent_id}"
-    token = _agentic_token_cache.get(key)
-    if token:
-        logger.debug(f"Retrieved cached agentic token for {key}")
-    else:
-        logger.debug(f"No cached token found for {key}")
+    key = (tenant_id, agent_id)
+    token = None
+    with _agentic_token_cache_lock:
+        entry = _agentic_token_cache.get(key)
+        if entry:
+            expires_at, token = entry
+            if expires_at <= time.monotonic():
+                del _agentic_token_cache[key]
+                token = None
+            else:
+                _agentic_token_cache.move_to_end(key)
+    if logger.isEnabledFor(logging.DEBUG):
+        if token:
+            logger.debug("Retrieved cached agentic token for %s:%s", tenant_id, agent_id)
+        else:
+            logger.debug("No cached token found for %s:%s", tenant_id, agent_id)
     return token